@@ -1,9 +1,30 @@
 from time import time
 import json
-import igraph
+import os
+import threading
+
+# Set `lazy_import` to defer importing igraph to the first request, and
+# `prewarm` (which implies `lazy_import`) to import it in background after startup
+PREWARM = os.getenv("prewarm", "false").lower() == "true"
+LAZY_IMPORT = PREWARM or os.getenv("lazy_import", "false").lower() == "true"
+
+igraph = None
+
+
+def load_modules():
+    global igraph
+    if igraph is None:
+        import igraph
+
+
+if not LAZY_IMPORT:
+    load_modules()
+elif PREWARM:
+    threading.Thread(target=load_modules, daemon=True).start()
 
 
 def handle(event, context):
+    load_modules()
     size = json.loads(event.body.decode()).get("size")
 
     start = time()
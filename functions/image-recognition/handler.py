@@ -1,14 +1,21 @@
 import json
+import os
+import threading
 from time import time
 from os import path
 
 import warnings
 warnings.filterwarnings("ignore", category=UserWarning)
 
-from PIL import Image
-import torch
-from torchvision import transforms
-from torchvision.models import resnet50
+# Set `lazy_import` to defer the heavy imports to the first request, and
+# `prewarm` (which implies `lazy_import`) to load them (and the model) in background after startup
+PREWARM = os.getenv('prewarm', 'false').lower() == 'true'
+LAZY_IMPORT = PREWARM or os.getenv('lazy_import', 'false').lower() == 'true'
+
+Image = None
+torch = None
+transforms = None
+resnet50 = None
 
 SCRIPT_DIR = path.abspath(path.join(path.dirname(__file__)))
 IMAGE_PATH = path.join(SCRIPT_DIR, 'images', '800px-Welsh_Springer_Spaniel.jpg')
@@ -17,19 +24,41 @@ CLASS_IDX_PATH = path.join(SCRIPT_DIR, 'imagenet_class_index.json')
 class_idx = None
 idx2label = None
 model = None
+lock = threading.Lock()
 
-def handle(event, context):
+def load_modules():
+    global Image
+    global torch
+    global transforms
+    global resnet50
+    if torch is None:
+        from PIL import Image
+        import torch
+        from torchvision import transforms
+        from torchvision.models import resnet50
+
+def load_model():
     global model
     global class_idx
     global idx2label
+    with lock:
+        load_modules()
+        if model is None:
+            model = resnet50()
+            model.load_state_dict(torch.load(MODEL_PATH))
+            model.eval()
+        if class_idx is None:
+            class_idx = json.load(open(CLASS_IDX_PATH, 'r'))
+            idx2label = [class_idx[str(k)][1] for k in range(len(class_idx))]
+
+if not LAZY_IMPORT:
+    load_modules()
+elif PREWARM:
+    threading.Thread(target=load_model, daemon=True).start()
+
+def handle(event, context):
     model_process_begin = time()
-    if model is None:
-        model = resnet50()
-        model.load_state_dict(torch.load(MODEL_PATH))
-        model.eval()
-    if class_idx is None:
-        class_idx = json.load(open(CLASS_IDX_PATH, 'r'))
-        idx2label = [class_idx[str(k)][1] for k in range(len(class_idx))]
+    load_model()
     model_process_end = time()
    
     process_begin = time()
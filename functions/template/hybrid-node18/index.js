@@ -0,0 +1,224 @@
+// Copyright (c) Alex Ellis 2021. All rights reserved.
+// Copyright (c) OpenFaaS Author(s) 2021. All rights reserved.
+// Licensed under the MIT license. See LICENSE file in the project root for full license information.
+
+"use strict";
+
+const process = require("process");
+const { Worker, isMainThread, workerData } = require("node:worker_threads");
+
+if (isMainThread) {
+  const crypto = require("crypto");
+  const zlib = require("zlib");
+  const express = require("express");
+  const app = express();
+  const handler = require("./function/handler");
+  const bodyParser = require("body-parser");
+
+  const defaultMaxSize = "100kb"; // body-parser default
+
+  app.disable("x-powered-by");
+
+  const rawLimit = process.env.MAX_RAW_SIZE || defaultMaxSize;
+  const jsonLimit = process.env.MAX_JSON_SIZE || defaultMaxSize;
+
+  app.use(function addDefaultContentType(req, res, next) {
+    // When no content-type is given, the body element is set to
+    // nil, and has been a source of contention for new users.
+
+    if (!req.headers["content-type"]) {
+      req.headers["content-type"] = "text/plain";
+    }
+    next();
+  });
+
+  if (process.env.RAW_BODY === "true") {
+    app.use(bodyParser.raw({ type: "*/*", limit: rawLimit }));
+  } else {
+    app.use(bodyParser.text({ type: "text/*" }));
+    app.use(bodyParser.json({ limit: jsonLimit }));
+    app.use(bodyParser.urlencoded({ extended: true }));
+  }
+
+  const isArray = (a) => {
+    return !!a && a.constructor === Array;
+  };
+
+  const isObject = (a) => {
+    return !!a && a.constructor === Object;
+  };
+
+  // Pick gzip if Accept-Encoding allows it, q=0 means not acceptable (zstd is not available in node18)
+  const acceptsGzip = (acceptEncoding) => {
+    const weights = {};
+    for (const item of (acceptEncoding || "").split(",")) {
+      const params = item.split(";");
+      let weight = 1;
+      for (const param of params.slice(1)) {
+        const [key, value] = param.trim().split("=");
+        if (key.trim() === "q") {
+          weight = parseFloat(value) || 0;
+        }
+      }
+      weights[params[0].trim().toLowerCase()] = weight;
+    }
+    const weight = "gzip" in weights ? weights["gzip"] : weights["*"] || 0;
+    return weight > 0;
+  };
+
+  // Apply the payload mode (X-Payload-Mode) and encoding requested by the client to an object result
+  const formatPayload = (req, result, resultHeaders) => {
+    const headers = Object.assign({}, resultHeaders);
+    let body = result;
+    let contentType = "application/json";
+
+    // Metrics are always in headers, so that clients can skip the body
+    if ("latency" in result) {
+      headers["X-Latency"] = String(result.latency);
+    }
+    if ("memory_usage" in result) {
+      headers["X-Memory-Usage"] = String(result.memory_usage);
+    }
+
+    const mode = req.headers["x-payload-mode"] || "inline";
+    if ("data" in result) {
+      const payload = Buffer.from(typeof result.data === "string" ? result.data : JSON.stringify(result.data), "utf8");
+      const digest = crypto.createHash("sha256").update(payload).digest("hex");
+      headers["X-Payload-Size"] = String(payload.length);
+      headers["X-Payload-Digest"] = digest;
+      if (mode === "digest") {
+        // Return size and digest of data only
+        body = Object.assign({}, result, { size: payload.length, digest: digest });
+        delete body.data;
+      } else if (mode === "binary") {
+        // Return data alone as body
+        body = payload;
+        contentType = "application/octet-stream";
+      }
+    }
+
+    if (acceptsGzip(req.headers["accept-encoding"])) {
+      body = zlib.gzipSync(Buffer.isBuffer(body) ? body : Buffer.from(JSON.stringify(body)), { level: 6 });
+      headers["Content-Encoding"] = "gzip";
+    }
+    if (Buffer.isBuffer(body)) {
+      headers["Content-Type"] = contentType;
+    } else {
+      body = JSON.stringify(body);
+    }
+    return { body, headers };
+  };
+
+  class FunctionEvent {
+    constructor(req) {
+      this.body = req.body;
+      this.headers = req.headers;
+      this.method = req.method;
+      this.query = req.query;
+      this.path = req.path;
+    }
+  }
+
+  class FunctionContext {
+    constructor(cb) {
+      this.statusCode = 200;
+      this.cb = cb;
+      this.headerValues = {};
+      this.cbCalled = 0;
+    }
+
+    status(statusCode) {
+      if (!statusCode) {
+        return this.statusCode;
+      }
+
+      this.statusCode = statusCode;
+      return this;
+    }
+
+    headers(value) {
+      if (!value) {
+        return this.headerValues;
+      }
+
+      this.headerValues = value;
+      return this;
+    }
+
+    succeed(value) {
+      let err;
+      this.cbCalled++;
+      this.cb(err, value);
+    }
+
+    fail(value) {
+      let message;
+      if (this.status() == "200") {
+        this.status(500);
+      }
+
+      this.cbCalled++;
+      this.cb(value, message);
+    }
+  }
+
+  const middleware = async (req, res) => {
+    const sharedBuffer = new SharedArrayBuffer(4); // 创建一个4字节的共享内存
+    const maxMemoryUsage = new Uint32Array(sharedBuffer); // 使用Uint32Array访问共享内存
+    const worker = new Worker(__filename, { workerData: maxMemoryUsage });
+
+    const cb = (err, functionResult) => {
+      worker.terminate();
+      const maxMemoryUsageMB = Atomics.load(maxMemoryUsage, 0) / 1024 / 1024;
+
+      if (err) {
+        console.error(err);
+
+        return res.status(fnContext.status()).send(err.toString ? err.toString() : err);
+      }
+
+      if (isArray(functionResult) || isObject(functionResult)) {
+        functionResult["memory_usage"] = maxMemoryUsageMB;
+        const { body, headers } = formatPayload(req, functionResult, fnContext.headers());
+        res.set(headers).status(fnContext.status()).send(body);
+      } else {
+        res.set(fnContext.headers()).status(fnContext.status()).send(functionResult);
+      }
+    };
+
+    const fnEvent = new FunctionEvent(req);
+    const fnContext = new FunctionContext(cb);
+
+    Promise.resolve(handler(fnEvent, fnContext, cb))
+      .then((res) => {
+        if (!fnContext.cbCalled) {
+          fnContext.succeed(res);
+        }
+      })
+      .catch((e) => {
+        cb(e);
+      });
+  };
+
+  app.post("/*", middleware);
+  app.get("/*", middleware);
+  app.patch("/*", middleware);
+  app.put("/*", middleware);
+  app.delete("/*", middleware);
+  app.options("/*", middleware);
+
+  const port = process.env.http_port || 3000;
+
+  app.listen(port, () => {
+    console.log(`node18 listening on port: ${port}`);
+  });
+} else {
+  const maxMemoryUsage = workerData;
+
+  setInterval(() => {
+    const currentMemoryUsage = process.memoryUsage().rss;
+    if (currentMemoryUsage > Atomics.load(maxMemoryUsage, 0)) {
+      Atomics.store(maxMemoryUsage, 0, currentMemoryUsage);
+    }
+  }, 10);
+}
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+
+# first activate virtual python environment
+import sys, os, traceback
+VIRTUALENV_PATH = "./faas"
+
+try:
+  # if the directory 'virtualenv' is extracted out of a zip file
+  path_to_virtualenv = os.path.abspath(VIRTUALENV_PATH)
+  if os.path.isdir(path_to_virtualenv):
+    # activate the virtualenv using activate_this.py contained in the virtualenv
+    activate_this_file = path_to_virtualenv + '/bin/activate_this.py'
+    if os.path.exists(activate_this_file):
+      with open(activate_this_file) as f:
+        code = compile(f.read(), activate_this_file, 'exec')
+        exec(code, dict(__file__=activate_this_file))
+    else:
+      sys.stderr.write("Invalid virtualenv. There does not include 'activate_this.py'.\n")
+      sys.exit(1)
+except Exception:
+  traceback.print_exc(file=sys.stderr, limit=0)
+  sys.exit(1)
+
+
+from flask import Flask, request, jsonify
+from waitress import serve
+import os
+import gzip
+import hashlib
+import json
+import zstandard
+
+from function import handler
+
+import psutil
+import multiprocessing
+import time
+import gc
+
+app = Flask(__name__)
+
+class Event:
+    def __init__(self):
+        self.body = request.get_data()
+        self.headers = request.headers
+        self.method = request.method
+        self.query = request.args
+        self.path = request.path
+
+class Context:
+    def __init__(self):
+        self.hostname = os.getenv('HOSTNAME', 'localhost')
+
+def format_status_code(res):
+    if 'statusCode' in res:
+        return res['statusCode']
+    
+    return 200
+
+def format_body(res, content_type):
+    if content_type == 'application/octet-stream':
+        return res['body']
+
+    if 'body' not in res:
+        return ""
+    elif type(res['body']) == dict:
+        return jsonify(res['body'])
+    elif type(res['body']) == bytes:
+        return res['body']
+    else:
+        return str(res['body'])
+
+def format_headers(res):
+    if 'headers' not in res:
+        return []
+    elif type(res['headers']) == dict:
+        headers = []
+        for key in res['headers'].keys():
+            header_tuple = (key, res['headers'][key])
+            headers.append(header_tuple)
+        return headers
+    
+    return res['headers']
+
+def get_content_type(res):
+    content_type = ""
+    if 'headers' in res and type(res['headers']) == dict:
+        for key, value in res['headers'].items():
+            if key.lower() == 'content-type':
+                content_type = value
+    return content_type
+
+# Pick the compression preferred by Accept-Encoding, None if there is none
+def negotiate_encoding(accept_encoding):
+    weights = {}
+    for item in accept_encoding.split(','):
+        params = item.split(';')
+        weight = 1.0
+        for param in params[1:]:
+            key, _, value = param.strip().partition('=')
+            if key.strip() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[params[0].strip().lower()] = weight
+
+    # zstd is preferred over gzip at the same weight, q=0 means not acceptable
+    candidates = [encoding for encoding in ['zstd', 'gzip'] if weights.get(encoding, weights.get('*', 0)) > 0]
+    if len(candidates) == 0:
+        return None
+    return max(candidates, key=lambda encoding: weights.get(encoding, weights.get('*', 0)))
+
+def compress(body, encoding):
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor().compress(body)
+    return gzip.compress(body, compresslevel=6)
+
+# Apply the payload mode (X-Payload-Mode) and encoding requested by the client to a dict body
+def format_payload(res, request_headers):
+    if type(res.get('body')) != dict or type(res.get('headers', {})) != dict:
+        return res
+    body = res['body']
+    headers = dict(res.get('headers', {}))
+    content_type = 'application/json'
+
+    # Metrics are always in headers, so that clients can skip the body
+    if 'latency' in body:
+        headers['X-Latency'] = str(body['latency'])
+    if 'memory_usage' in body:
+        headers['X-Memory-Usage'] = str(body['memory_usage'])
+
+    mode = request_headers.get('X-Payload-Mode', 'inline')
+    if 'data' in body:
+        data = body['data']
+        payload = data.encode() if type(data) == str else json.dumps(data).encode()
+        digest = hashlib.sha256(payload).hexdigest()
+        headers['X-Payload-Size'] = str(len(payload))
+        headers['X-Payload-Digest'] = digest
+        if mode == 'digest':
+            # Return size and digest of data only
+            body = {key: value for key, value in body.items() if key != 'data'}
+            body['size'] = len(payload)
+            body['digest'] = digest
+        elif mode == 'binary':
+            # Return data alone as body
+            body = payload
+            content_type = 'application/octet-stream'
+
+    encoding = negotiate_encoding(request_headers.get('Accept-Encoding', ''))
+    if encoding is not None:
+        if type(body) == dict:
+            body = json.dumps(body).encode()
+        body = compress(body, encoding)
+        headers['Content-Encoding'] = encoding
+    if type(body) == bytes:
+        headers['Content-type'] = content_type
+
+    return dict(res, body=body, headers=headers)
+
+def format_response(res):
+    if res == None:
+        return ('', 200)
+
+    statusCode = format_status_code(res)
+    content_type = get_content_type(res)
+    body = format_body(res, content_type)
+
+    headers = format_headers(res)
+
+    return (body, statusCode, headers)
+
+def monitor_memory(pid, max_memory_usage, interval = 0.01):
+    while True:
+        process = psutil.Process(pid)
+        memory_usage = process.memory_info().rss / 1024 / 1024  # Convert to MB
+        max_memory_usage.value = max(max_memory_usage.value, memory_usage)
+        time.sleep(interval)
+
+@app.route('/', defaults={'path': ''}, methods=['GET', 'PUT', 'POST', 'PATCH', 'DELETE'])
+@app.route('/<path:path>', methods=['GET', 'PUT', 'POST', 'PATCH', 'DELETE'])
+def call_handler(path):
+    event = Event()
+    context = Context()
+
+    # Start memory monitor
+    current_pid = psutil.Process().pid
+    max_memory_usage = multiprocessing.Value('d', 0.0)
+    monitor_process = multiprocessing.Process(target=monitor_memory, args=(current_pid, max_memory_usage))
+    monitor_process.start()
+
+    # Call handler
+    response_data = handler.handle(event, context)
+
+    # Stop memory monitor
+    monitor_process.terminate()
+    if type(response_data.get('body')) == dict:
+        response_data['body']['memory_usage'] = max_memory_usage.value
+    response_data = format_payload(response_data, request.headers)
+    
+    res = format_response(response_data)
+    return res
+
+if __name__ == '__main__':
+    serve(app, host='0.0.0.0', port=5000)
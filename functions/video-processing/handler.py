@@ -1,14 +1,33 @@
 from time import time
 from os import path
 import json
-import cv2
+import os
+import threading
+
+# Set `lazy_import` to defer importing cv2 to the first request, and
+# `prewarm` (which implies `lazy_import`) to import it in background after startup
+PREWARM = os.getenv('prewarm', 'false').lower() == 'true'
+LAZY_IMPORT = PREWARM or os.getenv('lazy_import', 'false').lower() == 'true'
+
+cv2 = None
 
 SCRIPT_DIR = path.abspath(path.join(path.dirname(__file__)))
 VIDEO_DIR = path.join(SCRIPT_DIR, 'video')
 VIDEO_PATH = path.join(VIDEO_DIR, 'sample-3s.mp4')
 OUTPUT_PATH = path.join('/tmp', 'sample-gray.mp4')
 
+def load_modules():
+    global cv2
+    if cv2 is None:
+        import cv2
+
+if not LAZY_IMPORT:
+    load_modules()
+elif PREWARM:
+    threading.Thread(target=load_modules, daemon=True).start()
+
 def handle(event, context):
+    load_modules()
     start = time()
     video = cv2.VideoCapture(VIDEO_PATH)
 
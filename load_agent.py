@@ -0,0 +1,229 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import json
+import math
+import socket
+import threading
+from time import process_time, sleep, time
+
+import requests
+
+# Relative precision of histogram buckets
+PRECISION = 0.01
+# Interval of result batches streamed back to the coordinator (seconds)
+BATCH_INTERVAL = 1.0
+
+
+class Histogram:
+    '''Log-bucketed histogram of positive values that can be merged across agents'''
+
+    def __init__(self, buckets: dict = None):
+        self.buckets = buckets if buckets is not None else {}
+
+    def add(self, value: float):
+        key = math.floor(math.log(max(value, 1e-6)) / math.log(1 + PRECISION))
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    def merge(self, other: 'Histogram'):
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+
+    @property
+    def count(self) -> int:
+        return sum(self.buckets.values())
+
+    @staticmethod
+    def value(key: int) -> float:
+        return (1 + PRECISION) ** (key + 0.5)
+
+    def mean(self) -> float:
+        count = self.count
+        if count == 0:
+            return 0.0
+        return sum(self.value(key) * n for key, n in self.buckets.items()) / count
+
+    def percentile(self, p: float) -> float:
+        count = self.count
+        if count == 0:
+            return 0.0
+        rank = p / 100 * count
+        seen = 0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen >= rank:
+                return self.value(key)
+        return self.value(max(self.buckets))
+
+    def to_dict(self) -> dict:
+        return {str(key): count for key, count in self.buckets.items()}
+
+    @staticmethod
+    def from_dict(data: dict) -> 'Histogram':
+        return Histogram({int(key): count for key, count in data.items()})
+
+
+class Batch:
+    '''Results collected by an agent since the last report'''
+
+    def __init__(self):
+        # Latency reported by the function
+        self.latency = Histogram()
+        # From the scheduled time, including waiting for a worker, as clients would see
+        self.e2e_latency = Histogram()
+        # From the time a worker sends the request
+        self.service_latency = Histogram()
+        # How late the dispatcher wakes up to submit a request, which grows when the client is overloaded
+        self.lag = Histogram()
+        # How long a submitted request waits for a free worker, which grows when functions are slow
+        self.queueing = Histogram()
+        self.errors = 0
+
+    def to_dict(self) -> dict:
+        return {
+            'latency': self.latency.to_dict(),
+            'e2e_latency': self.e2e_latency.to_dict(),
+            'service_latency': self.service_latency.to_dict(),
+            'lag': self.lag.to_dict(),
+            'queueing': self.queueing.to_dict(),
+            'errors': self.errors,
+        }
+
+
+def run_load(job: dict, send, stopped=None):
+    '''Drive an open-loop load described by `job`, streaming batches through `send` until done or `stopped()`'''
+    url = job['url']
+    request_body = job.get('request_body')
+    headers = job.get('headers')
+    rate = job['rate']
+    duration = job['duration']
+    timeout = job.get('timeout', 60)
+
+    local = threading.local()
+    lock = threading.Lock()
+    batch = Batch()
+
+    def invoke(scheduled: float):
+        start = time()
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        try:
+            response = session.post(url, json=request_body, headers=headers, timeout=timeout)
+            end = time()
+            if response.status_code != 200:
+                raise RuntimeError(f'[{response.status_code} {response.reason}]')
+            # Prefer metrics from headers to skip parsing the body
+            latency = response.headers.get('X-Latency')
+            if latency is None:
+                latency = response.json().get('latency')
+            latency = float(latency) if latency is not None else None
+            if latency is None:
+                raise RuntimeError('Invalid response')
+        except Exception:
+            with lock:
+                batch.errors += 1
+            return
+        with lock:
+            batch.latency.add(latency)
+            batch.e2e_latency.add(end - scheduled)
+            batch.service_latency.add(end - start)
+            batch.queueing.add(start - scheduled)
+
+    def report(final: bool = False):
+        nonlocal batch, last_wall, last_cpu
+        now, cpu = time(), process_time()
+        with lock:
+            current, batch = batch, Batch()
+        message = current.to_dict()
+        message['type'] = 'done' if final else 'batch'
+        # Process CPU time covers all threads, so 100% means one core is busy
+        message['cpu'] = (cpu - last_cpu) / max(now - last_wall, 1e-6) * 100
+        last_wall, last_cpu = now, cpu
+        send(message)
+
+    begin = last_wall = time()
+    last_cpu = process_time()
+    next_report = begin + BATCH_INTERVAL
+    interval = 1 / rate
+    with ThreadPoolExecutor(max_workers=job.get('concurrency', 16)) as executor:
+        for i in range(int(rate * duration)):
+            scheduled = begin + i * interval
+            while True:
+                now = time()
+                if now >= next_report:
+                    report()
+                    next_report += BATCH_INTERVAL
+                if now >= scheduled:
+                    break
+                sleep(max(min(scheduled, next_report) - now, 0))
+            if stopped is not None and stopped():
+                executor.shutdown(wait=False, cancel_futures=True)
+                break
+            with lock:
+                batch.lag.add(now - scheduled)
+            executor.submit(invoke, scheduled)
+    report(final=True)
+
+
+def run_local_agent(conn):
+    '''Entry of a forked load-generator process, talking through a multiprocessing pipe'''
+    job = conn.recv()
+    conn.send({'type': 'ready'})
+    conn.recv()
+    # Any further message from the coordinator stops the load early
+    run_load(job, conn.send, stopped=conn.poll)
+    conn.close()
+
+
+class SocketChannel:
+    '''Newline-delimited JSON messages over a TCP socket'''
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.file = sock.makefile('rw', encoding='utf-8')
+
+    @staticmethod
+    def connect(address: str) -> 'SocketChannel':
+        host, port = address.rsplit(':', 1)
+        return SocketChannel(socket.create_connection((host, int(port))))
+
+    def send(self, message: dict):
+        self.file.write(json.dumps(message) + '\n')
+        self.file.flush()
+
+    def recv(self) -> dict:
+        line = self.file.readline()
+        if line == '':
+            raise EOFError('Connection closed')
+        return json.loads(line)
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+
+def serve(host: str, port: int):
+    '''Serve jobs from remote coordinators, one at a time'''
+    with socket.create_server((host, port)) as server:
+        print(f'Load agent listening on {host}:{port}')
+        while True:
+            sock, address = server.accept()
+            channel = SocketChannel(sock)
+            try:
+                job = channel.recv()
+                print(f'Running job from {address[0]}: {job["url"]} at {job["rate"]} req/s for {job["duration"]}s')
+                channel.send({'type': 'ready'})
+                channel.recv()
+                run_load(job, channel.send)
+            except (EOFError, OSError) as e:
+                print(f'Warning: Lost coordinator {address[0]}: {e}')
+            finally:
+                channel.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', help='address to listen on (default: 0.0.0.0)', default='0.0.0.0')
+    parser.add_argument('--port', help='port to listen on (default: 9000)', type=int, default=9000)
+    args = parser.parse_args()
+    serve(args.host, args.port)
@@ -0,0 +1,124 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+
+import pytest
+
+from load_agent import Batch, Histogram, PRECISION, run_load
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.path.endswith('/failing'):
+            self.send_response(500)
+            self.end_headers()
+            return
+        body = json.dumps({'latency': 0.002}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def gateway():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+
+
+def test_histogram_percentile():
+    histogram = Histogram()
+    for value in range(1, 101):
+        histogram.add(value / 1000)
+
+    assert histogram.count == 100
+    # Buckets keep values within the relative precision
+    assert histogram.percentile(50) == pytest.approx(0.050, rel=PRECISION)
+    assert histogram.percentile(99) == pytest.approx(0.099, rel=PRECISION)
+    assert histogram.percentile(100) == pytest.approx(0.100, rel=PRECISION)
+    assert histogram.mean() == pytest.approx(0.0505, rel=PRECISION)
+
+
+def test_histogram_empty():
+    histogram = Histogram()
+
+    assert histogram.count == 0
+    assert histogram.mean() == 0.0
+    assert histogram.percentile(99) == 0.0
+
+
+def test_histogram_merge():
+    first = Histogram()
+    second = Histogram()
+    for _ in range(90):
+        first.add(0.010)
+    for _ in range(10):
+        second.add(1.0)
+    first.merge(second)
+
+    assert first.count == 100
+    assert first.percentile(50) == pytest.approx(0.010, rel=PRECISION)
+    assert first.percentile(95) == pytest.approx(1.0, rel=PRECISION)
+    # The merged histogram is not changed
+    assert second.count == 10
+
+
+def test_histogram_round_trip():
+    histogram = Histogram()
+    for value in [0.001, 0.002, 0.002, 0.5, 0]:
+        histogram.add(value)
+
+    data = json.loads(json.dumps(histogram.to_dict()))
+    restored = Histogram.from_dict(data)
+
+    assert restored.buckets == histogram.buckets
+    assert restored.percentile(50) == histogram.percentile(50)
+
+
+def test_run_load(gateway):
+    messages = []
+
+    run_load({'url': f'{gateway}/function/pyaes', 'rate': 50, 'duration': 1.5, 'concurrency': 4, 'timeout': 5}, messages.append)
+
+    assert [message['type'] for message in messages][-1] == 'done'
+    assert all(message['type'] == 'batch' for message in messages[:-1])
+    merged = Batch()
+    errors = 0
+    for message in messages:
+        for key in ['latency', 'e2e_latency', 'service_latency', 'lag', 'queueing']:
+            getattr(merged, key).merge(Histogram.from_dict(message[key]))
+        errors += message['errors']
+        assert message['cpu'] >= 0
+    assert errors == 0
+    assert merged.latency.count == 75
+    assert merged.lag.count == 75
+    assert merged.latency.percentile(50) == pytest.approx(0.002, rel=PRECISION)
+    # E2E latency starts at the scheduled time, so it covers service latency
+    assert merged.e2e_latency.percentile(99) >= merged.service_latency.percentile(99) * (1 - PRECISION)
+
+
+def test_run_load_errors(gateway):
+    messages = []
+
+    run_load({'url': f'{gateway}/function/failing', 'rate': 20, 'duration': 0.5, 'timeout': 5}, messages.append)
+
+    assert sum(message['errors'] for message in messages) == 10
+    assert sum(Histogram.from_dict(message['latency']).count for message in messages) == 0
+
+
+def test_run_load_stopped(gateway):
+    messages = []
+    stop = threading.Event()
+    threading.Timer(0.5, stop.set).start()
+
+    run_load({'url': f'{gateway}/function/pyaes', 'rate': 20, 'duration': 60, 'timeout': 5}, messages.append, stopped=stop.is_set)
+
+    assert messages[-1]['type'] == 'done'
+    assert sum(Histogram.from_dict(message['lag']).count for message in messages) < 20
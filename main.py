@@ -2,6 +2,7 @@ import argparse
 import multiprocessing
 import yaml
 
+from telemetry import CgroupSampler
 from test_driver import TestDriver
 
 if __name__ == '__main__':
@@ -9,7 +10,7 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument('-c', '--config', help='config file path (default: config.yml)', default='config.yml')
     parser.add_argument('-p', '--parallel', help=f'Build, push images in parallel to depth specified (default: {multiprocessing.cpu_count()})', type=int, default=multiprocessing.cpu_count())
-    parser.add_argument('action', help='action to perform (default: all)', nargs='*', choices=['login', 'logout', 'build', 'push', 'deploy', 'test', 'all'], default='all')
+    parser.add_argument('action', help='action to perform (default: all)', nargs='*', choices=['login', 'logout', 'build', 'push', 'deploy', 'test', 'all', 'load', 'interference', 'startup'], default='all')
 
     # 解析命令行参数
     args = parser.parse_args()
@@ -25,7 +26,8 @@ if __name__ == '__main__':
     provider = config.get('provider', {})
     gateway = provider.get('gateway', 'http://localhost:8080')
 
-    test_driver = TestDriver(gateway)
+    payload = config.get('payload', {})
+    test_driver = TestDriver(gateway, payload_mode=payload.get('mode', 'inline'), encoding=payload.get('encoding', 'identity'))
 
     # 登录faas-cli
     if 'login' in args.action or 'all' in args.action:
@@ -65,7 +67,45 @@ if __name__ == '__main__':
             max_retry = config.get('max_retry', 3)
             average = config.get('average', 3)
             warm_up_count = config.get('warm_up_count', 3)
-            test_driver.test(functions=functions, timeout=timeout, max_retry=max_retry, average=average, warm_up_count=warm_up_count)
+            telemetry = config.get('telemetry', {})
+            sampler = None
+            output = None
+            if telemetry.get('enabled', False):
+                sampler = CgroupSampler(list(functions), root=telemetry.get('cgroup_root', '/sys/fs/cgroup'), pattern=telemetry.get('pattern', 'openfaas-fn/{function}'), interval=telemetry.get('interval', 0.5))
+                output = telemetry.get('output')
+            test_driver.test(functions=functions, timeout=timeout, max_retry=max_retry, average=average, warm_up_count=warm_up_count, telemetry=sampler, output=output)
+
+    # 压力测试函数
+    if 'load' in args.action:
+        functions = config.get('functions', None)
+        if functions is None:
+            print('Warning: No functions to load')
+        else:
+            load = config.get('load', {})
+            timeout = config.get('timeout', 60)
+            test_driver.load(functions=functions, rate=load.get('rate', 10), duration=load.get('duration', 30), agents=load.get('agents', 1), remote_agents=load.get('remote_agents'), concurrency=load.get('concurrency', 16), timeout=timeout)
+
+    # 测试函数间干扰
+    if 'interference' in args.action:
+        functions = config.get('functions', None)
+        if functions is None:
+            print('Warning: No functions to test')
+        else:
+            interference = config.get('interference', {})
+            timeout = config.get('timeout', 60)
+            max_retry = config.get('max_retry', 3)
+            average = config.get('average', 3)
+            warm_up_count = config.get('warm_up_count', 3)
+            test_driver.interference(functions=functions, rate=interference.get('rate', 2), timeout=timeout, max_retry=max_retry, samples=interference.get('samples', average), warm_up_count=warm_up_count, subset=interference.get('functions'), time_budget=interference.get('time_budget'))
+
+    # 分析函数启动耗时
+    if 'startup' in args.action:
+        functions = config.get('functions', None)
+        if functions is None:
+            print('Warning: No functions to profile')
+        else:
+            startup = config.get('startup', {})
+            test_driver.profile_startup(functions=functions, environment=startup.get('environment'), command=startup.get('command'), top=startup.get('top', 10), output=startup.get('output'))
 
     # 登出faas-cli
     if 'logout' in args.action or 'all' in args.action:
@@ -0,0 +1,167 @@
+import gzip
+import hashlib
+import json
+from os import path
+import sys
+import threading
+
+import pytest
+from werkzeug.serving import make_server
+import zstandard
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), 'functions', 'template', 'hybrid-py'))
+import index
+import test_driver
+
+DATA = '<td><span class="column-1">1</span></td>' * 1000
+
+
+def handle(event, context):
+    return {
+        "statusCode": 200,
+        "body": {'latency': 0.25, 'data': DATA}
+    }
+
+
+def decompress(body: bytes, encoding: str) -> bytes:
+    if encoding == 'gzip':
+        return gzip.decompress(body)
+    if encoding == 'zstd':
+        return zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    return body
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(index.handler, 'handle', handle)
+    return index.app.test_client()
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    monkeypatch.setattr(index.handler, 'handle', handle)
+    server = make_server('127.0.0.1', 0, index.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+
+
+@pytest.mark.parametrize('accept_encoding, expected', [
+    ('', None),
+    ('identity', None),
+    ('gzip, deflate', 'gzip'),
+    ('gzip, zstd', 'zstd'),
+    ('zstd;q=0.5, gzip', 'gzip'),
+    ('gzip;q=0', None),
+    ('zstd;q=0, gzip;q=0.8', 'gzip'),
+    ('*', 'zstd'),
+    ('zstd;q=0, *', 'gzip'),
+    ('GZIP; q=1.0', 'gzip'),
+])
+def test_negotiate_encoding(accept_encoding, expected):
+    assert index.negotiate_encoding(accept_encoding) == expected
+
+
+@pytest.mark.parametrize('encoding', ['identity', 'gzip', 'zstd'])
+@pytest.mark.parametrize('mode', ['inline', 'digest', 'binary'])
+def test_call_handler(client, mode, encoding):
+    response = client.post('/', data='{}', headers={'X-Payload-Mode': mode, 'Accept-Encoding': encoding})
+
+    assert response.status_code == 200
+    assert float(response.headers['X-Latency']) == 0.25
+    memory_usage = float(response.headers['X-Memory-Usage'])
+    assert response.headers['X-Payload-Size'] == str(len(DATA))
+    assert response.headers['X-Payload-Digest'] == hashlib.sha256(DATA.encode()).hexdigest()
+    assert response.headers.get('Content-Encoding') == (None if encoding == 'identity' else encoding)
+
+    body = decompress(response.get_data(), encoding)
+    if mode == 'binary':
+        assert response.headers['Content-Type'] == 'application/octet-stream'
+        assert body == DATA.encode()
+        return
+    assert response.headers['Content-Type'] == 'application/json'
+    data = json.loads(body)
+    assert data['latency'] == 0.25
+    assert data['memory_usage'] == memory_usage
+    if mode == 'inline':
+        assert data['data'] == DATA
+    else:
+        assert 'data' not in data
+        assert data['size'] == len(DATA)
+        assert data['digest'] == response.headers['X-Payload-Digest']
+
+
+def test_call_handler_text_body(client, monkeypatch):
+    monkeypatch.setattr(index.handler, 'handle', lambda event, context: {"statusCode": 200, "body": "Hello from OpenFaaS!"})
+
+    response = client.post('/', data='{}', headers={'X-Payload-Mode': 'binary', 'Accept-Encoding': 'gzip'})
+
+    assert response.status_code == 200
+    assert response.get_data() == b'Hello from OpenFaaS!'
+
+
+@pytest.mark.parametrize('encoding', ['identity', 'gzip', 'zstd'])
+@pytest.mark.parametrize('mode', ['inline', 'digest', 'binary'])
+def test_invoke(gateway, mode, encoding):
+    driver = test_driver.TestDriver.__new__(test_driver.TestDriver)
+    driver.gateway = gateway
+    driver.headers = {'X-Payload-Mode': mode, 'Accept-Encoding': encoding}
+
+    sample = driver.invoke('chameleon', {}, timeout=5, max_retry=1)
+
+    assert sample['latency'] == 0.25
+    # The template samples memory asynchronously, so a fast handler may report 0
+    assert sample['memory_usage'] >= 0
+    assert sample['decode_latency'] >= 0
+    if encoding == 'identity' and mode == 'binary':
+        assert sample['response_size'] == len(DATA)
+    elif encoding != 'identity':
+        assert sample['response_size'] < len(DATA)
+
+
+def test_invoke_digest_mismatch(monkeypatch):
+    def app(environ, start_response):
+        start_response('200 OK', [('Content-Type', 'application/octet-stream'), ('X-Latency', '0.25'), ('X-Payload-Digest', '0' * 64)])
+        return [DATA.encode()]
+    server = make_server('127.0.0.1', 0, app)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    driver = test_driver.TestDriver.__new__(test_driver.TestDriver)
+    driver.gateway = f'http://127.0.0.1:{server.server_port}'
+    driver.headers = {'X-Payload-Mode': 'binary', 'Accept-Encoding': 'identity'}
+
+    try:
+        with pytest.raises(RuntimeError, match='digest mismatch'):
+            driver.invoke('chameleon', {}, timeout=5, max_retry=1)
+    finally:
+        server.shutdown()
+
+
+def test_measure_without_memory_usage():
+    def app(environ, start_response):
+        start_response('200 OK', [('Content-Type', 'application/json')])
+        return [b'{"latency": 0.25}']
+    server = make_server('127.0.0.1', 0, app)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    driver = test_driver.TestDriver.__new__(test_driver.TestDriver)
+    driver.gateway = f'http://127.0.0.1:{server.server_port}'
+    driver.headers = {}
+
+    try:
+        assert driver.invoke('pyaes', {}, timeout=5, max_retry=1)['memory_usage'] is None
+        measured = driver.measure('pyaes', {}, 5, 1, 2, 0, driver.create_session(1), 'Testing pyaes')
+    finally:
+        server.shutdown()
+
+    assert measured['latency'] == 0.25
+    assert measured['memory_usage'] is None
+
+
+def test_decode_body():
+    body = b'{"latency": 0.25}'
+
+    assert test_driver.TestDriver.decode_body(gzip.compress(body), 'gzip') == body
+    assert test_driver.TestDriver.decode_body(zstandard.ZstdCompressor().compress(body), 'zstd') == body
+    assert test_driver.TestDriver.decode_body(body, 'identity') == body
+    with pytest.raises(RuntimeError):
+        test_driver.TestDriver.decode_body(body, 'br')
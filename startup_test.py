@@ -0,0 +1,79 @@
+from os import path
+import subprocess
+
+import test_driver
+
+# Trimmed `python -X importtime -c "import index"` output of a function image
+IMPORT_TIME = '''\
+import time: self [us] | cumulative | imported package
+import time:       310 |        310 |   _io
+import time:        52 |         52 |   marshal
+import time:      1021 |       1383 | _frozen_importlib_external
+import time:       812 |        812 |     _abc
+import time:      2104 |       2916 |   abc
+import time:      9874 |      12790 | site
+import time:      4012 |       4012 |       werkzeug.routing
+import time:      8001 |      12013 |     werkzeug
+import time:      3020 |      15033 |   flask
+import time:      1500 |       1500 |   waitress
+import time:       201 |        201 |   function
+import time:     90000 |      90000 |       torch._C
+import time:    150000 |     240000 |     torch
+import time:       700 |     240700 |   function.handler
+import time:      2400 |       2400 |   psutil
+import time:       600 |     260434 | index
+'''
+
+
+def test_parse_import_time():
+    tree = test_driver.TestDriver.parse_import_time(IMPORT_TIME)
+
+    assert [node['name'] for node in tree] == ['_frozen_importlib_external', 'site', 'index']
+    assert [child['name'] for child in tree[0]['children']] == ['_io', 'marshal']
+    index = tree[2]
+    assert (index['self'], index['cumulative']) == (600, 260434)
+    assert [child['name'] for child in index['children']] == ['flask', 'waitress', 'function', 'function.handler', 'psutil']
+    flask = index['children'][0]
+    assert [child['name'] for child in flask['children']] == ['werkzeug']
+    assert [child['name'] for child in flask['children'][0]['children']] == ['werkzeug.routing']
+    torch = index['children'][3]['children'][0]
+    assert torch['name'] == 'torch'
+    assert [child['name'] for child in torch['children']] == ['torch._C']
+    assert test_driver.TestDriver.count_modules(index) == 10
+
+
+def test_parse_import_time_ignores_other_output():
+    text = 'Traceback (most recent call last):\nimport time: self [us] | cumulative | imported package\nimport time:        10 |         10 | json\n'
+
+    tree = test_driver.TestDriver.parse_import_time(text)
+
+    assert tree == [{'name': 'json', 'self': 10, 'cumulative': 10, 'children': []}]
+
+
+def test_boot_path():
+    boot = test_driver.TestDriver.boot_path(test_driver.TestDriver.parse_import_time(IMPORT_TIME))
+
+    # Interpreter startup is left out
+    assert [node['name'] for node in boot] == ['index']
+    imports = test_driver.TestDriver.flatten_imports(boot)
+    names = [node['name'] for node in imports]
+    assert 'index' not in names and 'function' not in names and 'function.handler' not in names
+    assert max(imports, key=lambda node: node['cumulative'])['name'] == 'torch'
+
+
+def test_profile_startup_keeps_going(monkeypatch, capsys):
+    def run(args, **kwargs):
+        if 'defaultlin/chameleon:latest' in args:
+            return subprocess.CompletedProcess(args, 1, '', "ModuleNotFoundError: No module named 'chameleon'\n")
+        return subprocess.CompletedProcess(args, 0, '', IMPORT_TIME)
+    monkeypatch.setattr(test_driver.subprocess, 'run', run)
+    monkeypatch.chdir(path.dirname(path.abspath(__file__)))
+    driver = test_driver.TestDriver.__new__(test_driver.TestDriver)
+
+    profiles = driver.profile_startup({'chameleon': {}, 'crypto': {}, 'image-recognition': {}})
+
+    # Node functions are skipped, and a failed function does not stop the others
+    assert list(profiles) == ['image-recognition']
+    output = capsys.readouterr().out
+    assert "Warning: Failed to profile chameleon: ModuleNotFoundError: No module named 'chameleon'" in output
+    assert 'torch' in output
@@ -0,0 +1,115 @@
+from os import path
+import threading
+from time import time
+
+# Counters that only grow, reported as deltas over a time window
+COUNTERS = ['usage_usec', 'nr_periods', 'nr_throttled', 'throttled_usec', 'rbytes', 'wbytes', 'rios', 'wios']
+
+
+class CgroupSampler:
+    '''Sample cgroup v2 stats of function containers in background'''
+
+    def __init__(self, functions: list[str], root: str = '/sys/fs/cgroup', pattern: str = 'openfaas-fn/{function}', interval: float = 0.5):
+        self.functions = functions
+        self.root = root
+        self.pattern = pattern
+        self.interval = interval
+        self.samples = {function: [] for function in functions}
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        '''Start sampling'''
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        '''Stop sampling, taking a last sample so windows ending now are covered'''
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.sample()
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.sample()
+            self.stopped.wait(self.interval)
+
+    def sample(self):
+        '''Take one sample of every function, skipping those that fail to read'''
+        for function in self.functions:
+            cgroup = path.join(self.root, self.pattern.format(function=function))
+            if not path.isdir(cgroup):
+                continue
+            # Keep sampling other functions and later intervals, e.g. when a container is removed while reading
+            try:
+                stats = self.read(cgroup)
+            except Exception as e:
+                print(f'Warning: Failed to sample {function}: {e}')
+                continue
+            stats['timestamp'] = time()
+            self.samples[function].append(stats)
+
+    @staticmethod
+    def read(cgroup: str) -> dict:
+        '''Read cpu, memory and io stats of a cgroup, skipping missing files'''
+        stats = {}
+
+        def read_file(name: str):
+            try:
+                with open(path.join(cgroup, name), 'r') as f:
+                    return f.read()
+            except OSError:
+                return None
+
+        # cpu.stat and memory.stat: "key value" lines
+        content = read_file('cpu.stat')
+        if content is not None:
+            for line in content.splitlines():
+                key, value = line.split()
+                stats[key] = int(value)
+        content = read_file('memory.stat')
+        if content is not None:
+            for line in content.splitlines():
+                key, value = line.split()
+                if key == 'file':
+                    stats['page_cache'] = int(value)
+
+        for name, key in [('memory.current', 'memory_current'), ('memory.peak', 'memory_peak')]:
+            content = read_file(name)
+            if content is not None:
+                stats[key] = int(content)
+
+        # io.stat: "major:minor key=value ..." lines, summed over devices
+        content = read_file('io.stat')
+        if content is not None:
+            for line in content.splitlines():
+                for field in line.split()[1:]:
+                    key, value = field.split('=')
+                    if key in COUNTERS:
+                        stats[key] = stats.get(key, 0) + int(value)
+
+        return stats
+
+    def window(self, function: str, start: float, end: float) -> dict:
+        '''Summarize stats of a function over the sampling interval covering start and end timestamps'''
+        samples = self.samples.get(function, [])
+        before = [sample for sample in samples if sample['timestamp'] <= start]
+        after = [sample for sample in samples if sample['timestamp'] >= end]
+        if len(before) == 0 or len(after) == 0:
+            return {}
+        first, last = before[-1], after[0]
+        inside = [sample for sample in samples if first['timestamp'] <= sample['timestamp'] <= last['timestamp']]
+
+        result = {key: last[key] - first[key] for key in COUNTERS if key in first and key in last}
+        # Counters can only be attributed to whole sampling intervals, which are usually longer than the window
+        result['duration'] = last['timestamp'] - first['timestamp']
+        for key in ['memory_current', 'page_cache']:
+            values = [sample[key] for sample in inside if key in sample]
+            if len(values) > 0:
+                result[f'max_{key}'] = max(values)
+        if 'memory_peak' in last:
+            result['memory_peak'] = last['memory_peak']
+        return result
@@ -0,0 +1,80 @@
+from time import sleep
+
+from telemetry import CgroupSampler
+
+
+def write_cgroup(root, function, usage_usec, throttled_usec, memory_current, rbytes):
+    cgroup = root / 'openfaas-fn' / function
+    cgroup.mkdir(parents=True, exist_ok=True)
+    (cgroup / 'cpu.stat').write_text(f'usage_usec {usage_usec}\nuser_usec 0\nsystem_usec 0\nnr_periods 10\nnr_throttled 2\nthrottled_usec {throttled_usec}\n')
+    (cgroup / 'memory.current').write_text(f'{memory_current}\n')
+    (cgroup / 'memory.peak').write_text('4096\n')
+    (cgroup / 'memory.stat').write_text('anon 1024\nfile 512\n')
+    (cgroup / 'io.stat').write_text(f'8:0 rbytes={rbytes} wbytes=20 rios=1 wios=2 dbytes=0 dios=0\n8:16 rbytes={rbytes} wbytes=30 rios=3 wios=4 dbytes=0 dios=0\n')
+    return cgroup
+
+
+def test_read(tmp_path):
+    cgroup = write_cgroup(tmp_path, 'chameleon', 100, 50, 2048, 10)
+
+    stats = CgroupSampler.read(str(cgroup))
+
+    assert stats['usage_usec'] == 100
+    assert stats['throttled_usec'] == 50
+    assert stats['memory_current'] == 2048
+    assert stats['memory_peak'] == 4096
+    assert stats['page_cache'] == 512
+    # io.stat is summed across devices
+    assert stats['rbytes'] == 20
+    assert stats['wbytes'] == 50
+    assert stats['rios'] == 4
+    assert stats['wios'] == 6
+
+
+def test_read_missing_files(tmp_path):
+    cgroup = tmp_path / 'openfaas-fn' / 'pyaes'
+    cgroup.mkdir(parents=True)
+    (cgroup / 'memory.current').write_text('1024\n')
+
+    assert CgroupSampler.read(str(cgroup)) == {'memory_current': 1024}
+
+
+def test_window(tmp_path, monkeypatch):
+    sampler = CgroupSampler(['chameleon', 'pyaes'], root=str(tmp_path))
+    timestamps = iter([10.0, 20.0, 30.0])
+    monkeypatch.setattr('telemetry.time', lambda: next(timestamps))
+    for usage_usec, throttled_usec, memory_current, rbytes in [(100, 0, 1024, 10), (300, 40, 8192, 60), (400, 90, 2048, 110)]:
+        write_cgroup(tmp_path, 'chameleon', usage_usec, throttled_usec, memory_current, rbytes)
+        sampler.sample()
+
+    window = sampler.window('chameleon', 10.0, 30.0)
+
+    assert window['usage_usec'] == 300
+    assert window['throttled_usec'] == 90
+    assert window['rbytes'] == 200
+    assert window['max_memory_current'] == 8192
+    assert window['memory_peak'] == 4096
+    assert window['duration'] == 20.0
+    assert sampler.window('chameleon', 15.0, 25.0)['throttled_usec'] == 90
+    # Windows not covered by samples, and functions not running, have no stats
+    assert sampler.window('chameleon', 5.0, 30.0) == {}
+    assert sampler.window('pyaes', 10.0, 30.0) == {}
+
+
+def test_sample_malformed(tmp_path, capsys):
+    sampler = CgroupSampler(['chameleon', 'pyaes'], root=str(tmp_path))
+    cgroup = write_cgroup(tmp_path, 'chameleon', 100, 50, 2048, 10)
+    (cgroup / 'cpu.stat').write_text('usage_usec\n')
+    write_cgroup(tmp_path, 'pyaes', 100, 50, 2048, 10)
+
+    sampler.sample()
+
+    assert 'Warning: Failed to sample chameleon' in capsys.readouterr().out
+    assert sampler.samples['chameleon'] == []
+    assert len(sampler.samples['pyaes']) == 1
+    # The sampling thread keeps running after a failure
+    sampler.interval = 0.01
+    sampler.start()
+    sleep(0.05)
+    sampler.stop()
+    assert len(sampler.samples['pyaes']) > 2
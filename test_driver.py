@@ -1,16 +1,45 @@
+from collections import defaultdict
+import gzip
+import hashlib
 import json
 import matplotlib.pyplot as plt
+import multiprocessing
+from os import path
+import queue
 import requests
 from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util.retry import Retry
 import subprocess
-from time import time
+import threading
+from time import sleep, time
 from tqdm import tqdm
 import tabulate
+import yaml
+import zstandard
+
+from load_agent import Histogram, SocketChannel, run_local_agent
+from telemetry import CgroupSampler
+
+# A load-generator process above these is the bottleneck rather than faasd
+SATURATION_CPU = 90
+SATURATION_LAG = 0.01
+# Seconds to let the background load build up before measuring
+INTERFERENCE_SETTLE = 3
+# Background load duration when no time budget is given, stopped once the target has been measured
+INTERFERENCE_MAX_DURATION = 24 * 60 * 60
+# Pairs whose antagonist completes less than this share of the background load are left out
+INTERFERENCE_MIN_RATE = 0.8
+# Imports the template entry module with import time profiling enabled, which activates the function
+# virtualenv and imports Flask, waitress, psutil and the handler, without starting the server
+STARTUP_COMMAND = ['python', '-X', 'importtime', '-c', 'import index']
+# Modules of the function boot path, the rest of the import tree is interpreter startup
+STARTUP_MODULES = ['index', 'function']
 
 class TestDriver:
-    def __init__(self, gateway: str):
+    def __init__(self, gateway: str, payload_mode: str = 'inline', encoding: str = 'identity'):
         self.gateway = gateway
+        # Ask functions for the payload mode and encoding of responses
+        self.headers = {'X-Payload-Mode': payload_mode, 'Accept-Encoding': encoding}
 
         # Check faas-cli
         try:
@@ -50,9 +79,9 @@ class TestDriver:
         self.push(parallel)
         self.deploy()
 
-    def test(self, functions: dict, timeout: int, max_retry: int, average: int, warm_up_count: int):
-        '''Test functions'''
-        # Init requests
+    @staticmethod
+    def create_session(max_retry: int) -> requests.Session:
+        '''Create requests session retrying on gateway errors'''
         retry_strategy = Retry(
             total=max_retry,
             status_forcelist=[429, 500, 502, 503, 504],
@@ -63,69 +92,473 @@ class TestDriver:
         http = requests.Session()
         http.mount('https://', adapter)
         http.mount('http://', adapter)
+        return http
+
+    def invoke(self, function: str, request_body, timeout: int, max_retry: int) -> dict:
+        '''Invoke function once, retrying failed requests'''
+        retry_count = 0
+        response = None
+        error = None
+        while (response is None or response.status_code != 200) and retry_count < max_retry:
+            start = time()
+            try:
+                response = requests.post(f'{self.gateway}/function/{function}', json=request_body, headers=self.headers, timeout=timeout, stream=True)
+                if response.status_code != 200:
+                    raise RuntimeError(f'[{response.status_code} {response.reason}] {response.text}')
+                # Download body as is, so that decompression is measured as decoding
+                transfer_start = time()
+                body = response.raw.read(decode_content=False)
+            except Exception as e:
+                error = e
+                retry_count += 1
+                continue
+            end = time()
+            error = None
+        if error is not None or response is None:
+            raise RuntimeError(f'Max retry limit exceeded: {error}')
+        if len(body) == 0:
+            raise RuntimeError(f'Empty response from {function}')
+
+        # Read metrics from headers, a binary body is only decompressed and checked against its digest
+        decode_start = time()
+        data = {}
+        content = self.decode_body(body, response.headers.get('Content-Encoding', 'identity'))
+        if response.headers.get('Content-Type', '').split(';')[0] == 'application/octet-stream':
+            digest = response.headers.get('X-Payload-Digest')
+            if digest is not None and hashlib.sha256(content).hexdigest() != digest:
+                raise RuntimeError(f'Payload digest mismatch from {function}')
+        else:
+            data = json.loads(content)
+        decode_latency = time() - decode_start
+        latency = response.headers.get('X-Latency', data.get('latency'))
+        if latency is None:
+            raise RuntimeError(f'Invalid response from {function}')
+        memory_usage = response.headers.get('X-Memory-Usage', data.get('memory_usage'))
+        return {
+            'start': start,
+            'end': end,
+            'latency': float(latency),
+            'e2e_latency': end - start,
+            'transfer_latency': end - transfer_start,
+            'decode_latency': decode_latency,
+            'response_size': len(body),
+            'memory_usage': float(memory_usage) if memory_usage is not None else None,
+        }
+
+    @staticmethod
+    def decode_body(body: bytes, encoding: str) -> bytes:
+        '''Decompress response body'''
+        if encoding == 'gzip':
+            return gzip.decompress(body)
+        if encoding == 'zstd':
+            return zstandard.ZstdDecompressor().decompressobj().decompress(body)
+        if encoding == 'identity':
+            return body
+        raise RuntimeError(f'Unsupported content encoding {encoding}')
+
+    def test(self, functions: dict, timeout: int, max_retry: int, average: int, warm_up_count: int, telemetry: CgroupSampler = None, output: str = None):
+        '''Test functions'''
+        # Init requests
+        http = self.create_session(max_retry)
+        if telemetry is not None:
+            telemetry.start()
         
         result = []
+        samples = {}
         for function, conf in tqdm(functions.items(), desc='Testing Functions', unit='function', position=0, ncols=80, leave=None, bar_format='{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}]'):
             request_body = conf.get('request_body')
 
             # Warm up
             for _ in tqdm(range(warm_up_count), desc=f'Warming up {function}', unit='warmup', position=1, ncols=80, leave=None):
-                http.post(f'{self.gateway}/function/{function}', json=request_body, timeout=timeout)
+                http.post(f'{self.gateway}/function/{function}', json=request_body, headers=self.headers, timeout=timeout)
 
             # Perform test
             total_latency = 0
             total_e2e_latency = 0
             total_memory_usage = 0.0
+            memory_count = 0
+            total_transfer_latency = 0
+            total_decode_latency = 0
+            total_response_size = 0
+            samples[function] = []
             for _ in tqdm(range(average), desc=f'Testing {function}', unit='test', position=1, ncols=80, leave=None):
-                retry_count = 0
-                response = None
-                error = None
-                e2e_latency = 0
-                while (response is None or response.status_code != 200) and retry_count < max_retry:
-                    start = time()
-                    try:
-                        response = requests.post(f'{self.gateway}/function/{function}', json=request_body, timeout=timeout)
-                        if response.status_code != 200:
-                            raise RuntimeError(f'[{response.status_code} {response.reason}] {response.text}')
-                    except Exception as e:
-                        error = e
-                        retry_count += 1
-                        continue
-                    e2e_latency = time() - start
-                    error = None
-                if error is not None or response is None:
-                    raise RuntimeError(f'Max retry limit exceeded: {error}')
-                if response.text is None or response.text == '':
-                    raise RuntimeError(f'Empty response from {function}')
-                data = response.json()
-                latency = data.get('latency')
-                if latency is None:
-                    raise RuntimeError(f'Invalid response from {function}')
-                total_latency += latency
-                total_e2e_latency += e2e_latency
-                total_memory_usage += data.get('memory_usage', 0)
+                sample = self.invoke(function, request_body, timeout, max_retry)
+                total_latency += sample['latency']
+                total_e2e_latency += sample['e2e_latency']
+                if sample['memory_usage'] is not None:
+                    total_memory_usage += sample['memory_usage']
+                    memory_count += 1
+                total_transfer_latency += sample['transfer_latency']
+                total_decode_latency += sample['decode_latency']
+                total_response_size += sample['response_size']
+                samples[function].append(sample)
             result.append({
                 'Name': function,
                 'Average Latency(ms)': int(total_latency * 1000 / average),
-                'Average Other Latencies(ms)': int((total_e2e_latency - total_latency) * 1000 / average),
-                'Memory Usage(MB)': total_memory_usage / average
+                'Average Transfer Latency(ms)': int(total_transfer_latency * 1000 / average),
+                'Average Other Latencies(ms)': int((total_e2e_latency - total_latency - total_transfer_latency) * 1000 / average),
+                'Average Decode Latency(ms)': total_decode_latency * 1000 / average,
+                'Response Size(KB)': total_response_size / 1024 / average,
+                'Memory Usage(MB)': total_memory_usage / memory_count if memory_count > 0 else None
             })
+
+        # Relate samples to container stats over the same time
+        if telemetry is not None:
+            telemetry.stop()
+            for item in result:
+                function_samples = samples[item['Name']]
+                for sample in function_samples:
+                    sample['telemetry'] = telemetry.window(item['Name'], sample['start'], sample['end'])
+                stats = telemetry.window(item['Name'], function_samples[0]['start'], function_samples[-1]['end'])
+                slowest = max(function_samples, key=lambda sample: sample['e2e_latency'])
+                item['CPU Throttled(ms)'] = stats.get('throttled_usec', 0) / 1000
+                # Throttling is sampled per interval, so report the interval around the slowest request with it
+                item['Slowest Throttled(ms)'] = slowest['telemetry'].get('throttled_usec', 0) / 1000
+                item['Slowest Interval(ms)'] = slowest['telemetry'].get('duration', 0) * 1000
+                item['Max Memory Current(MB)'] = stats.get('max_memory_current', 0) / 1024 / 1024
+                item['Lifetime Memory Peak(MB)'] = stats.get('memory_peak', 0) / 1024 / 1024
+                item['Page Cache(MB)'] = stats.get('max_page_cache', 0) / 1024 / 1024
+                item['IO(MB)'] = (stats.get('rbytes', 0) + stats.get('wbytes', 0)) / 1024 / 1024
+        if output is not None:
+            with open(output, 'w') as f:
+                json.dump({
+                    'samples': samples,
+                    'telemetry': telemetry.samples if telemetry is not None else {},
+                }, f, indent=2)
         
         print('Test completed')
-        print(tabulate.tabulate(result, headers='keys', floatfmt='.3f', numalign='right'))
+        print(tabulate.tabulate(result, headers='keys', floatfmt='.3f', numalign='right', missingval='-'))
 
         # Draw result
         self.draw_result(result)
-        self.draw_memory_graph([item['Memory Usage(MB)'] for item in result], [item['Name'] for item in result])
+        self.draw_memory_graph([item['Memory Usage(MB)'] or 0 for item in result], [item['Name'] for item in result])
 
         return result
-    
+
+    def measure(self, function: str, request_body, timeout: int, max_retry: int, samples: int, warm_up_count: int, http: requests.Session, desc: str) -> dict:
+        '''Warm up function and average its latency and memory usage over samples, memory usage is None if never reported'''
+        for _ in range(warm_up_count):
+            http.post(f'{self.gateway}/function/{function}', json=request_body, headers=self.headers, timeout=timeout)
+        total = {'latency': 0.0, 'e2e_latency': 0.0}
+        memory_usage = []
+        for _ in tqdm(range(samples), desc=desc, unit='test', position=1, ncols=80, leave=None):
+            sample = self.invoke(function, request_body, timeout, max_retry)
+            for key in total:
+                total[key] += sample[key]
+            if sample['memory_usage'] is not None:
+                memory_usage.append(sample['memory_usage'])
+        result = {key: value / samples for key, value in total.items()}
+        result['memory_usage'] = sum(memory_usage) / len(memory_usage) if len(memory_usage) > 0 else None
+        return result
+
+    def interference(self, functions: dict, rate: float, timeout: int, max_retry: int, samples: int, warm_up_count: int, subset: list[str] = None, time_budget: float = None):
+        '''Measure slowdown of every function while another one runs at a fixed background load'''
+        http = self.create_session(max_retry)
+        names = [name for name in functions if subset is None or name in subset]
+
+        # Isolated baseline
+        baseline = {}
+        for function in tqdm(names, desc='Measuring Baselines', unit='function', position=0, ncols=80, leave=None, bar_format='{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}]'):
+            baseline[function] = self.measure(function, functions[function].get('request_body'), timeout, max_retry, samples, warm_up_count, http, f'Testing {function}')
+
+        # Shrink samples per pair to keep the whole run within the time budget
+        pairs = [(antagonist, target) for antagonist in names for target in names if antagonist != target]
+        def estimate(target: str, count: int) -> float:
+            return INTERFERENCE_SETTLE + (warm_up_count + count) * baseline[target]['e2e_latency']
+        pair_samples = samples
+        if time_budget is not None:
+            total = sum(estimate(target, samples) for _, target in pairs)
+            if total > time_budget:
+                pair_samples = max(1, int(samples * time_budget / total))
+                print(f'Warning: Estimated {int(total)}s exceeds time budget, using {pair_samples} samples per pair')
+
+        slowdown = {target: {antagonist: None for antagonist in names} for target in names}
+        memory = {target: {antagonist: None for antagonist in names} for target in names}
+        begin = time()
+        for antagonist, target in tqdm(pairs, desc='Testing Pairs', unit='pair', position=0, ncols=80, leave=None, bar_format='{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}]'):
+            if time_budget is not None and time() - begin + estimate(target, pair_samples) > time_budget:
+                print(f'Warning: Time budget exhausted, skipping {antagonist} -> {target}')
+                continue
+
+            # Run antagonist in background until the target has been measured
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=run_local_agent, args=(child,), daemon=True)
+            process.start()
+            child.close()
+            parent.send({
+                'url': f'{self.gateway}/function/{antagonist}',
+                'headers': self.headers,
+                'request_body': functions[antagonist].get('request_body'),
+                'rate': rate,
+                'duration': time_budget if time_budget is not None else INTERFERENCE_MAX_DURATION,
+                'timeout': timeout,
+            })
+            parent.recv()
+            parent.send({'type': 'start'})
+            background_start = time()
+            try:
+                sleep(INTERFERENCE_SETTLE)
+                measured = self.measure(target, functions[target].get('request_body'), timeout, max_retry, pair_samples, warm_up_count, http, f'Testing {target} with {antagonist}')
+            finally:
+                parent.send({'type': 'stop'})
+                background_duration = time() - background_start
+                completed = 0
+                errors = 0
+                while True:
+                    message = parent.recv()
+                    completed += Histogram.from_dict(message['e2e_latency']).count
+                    errors += message['errors']
+                    if message['type'] == 'done':
+                        break
+                process.join()
+                parent.close()
+
+            # Without the background load the pair would look free of interference
+            achieved_rate = completed / background_duration
+            if achieved_rate < rate * INTERFERENCE_MIN_RATE:
+                print(f'Warning: {antagonist} only completed {achieved_rate:.2f} of {rate} req/s with {errors} errors, skipping {antagonist} -> {target}')
+                continue
+            memory[target][antagonist] = measured['memory_usage']
+            # A function reporting no computing latency has no slowdown to compare
+            if baseline[target]['latency'] <= 0:
+                print(f'Warning: {target} reported zero baseline latency, leaving {antagonist} -> {target} out of the slowdown matrix')
+                continue
+            slowdown[target][antagonist] = measured['latency'] / baseline[target]['latency']
+
+        print('Interference test completed')
+        print('Slowdown (row: target, column: antagonist)')
+        print(tabulate.tabulate([[target] + [slowdown[target][antagonist] for antagonist in names] for target in names], headers=['Target'] + names, floatfmt='.3f', numalign='right', missingval='-'))
+        print('Memory Usage(MB) (row: target, column: antagonist, baseline: isolated)')
+        print(tabulate.tabulate([[target, baseline[target]['memory_usage']] + [memory[target][antagonist] for antagonist in names] for target in names], headers=['Target', 'Baseline'] + names, floatfmt='.3f', numalign='right', missingval='-'))
+
+        # Draw result
+        self.draw_heatmap(slowdown, names)
+
+        return slowdown, memory
+
+    def load(self, functions: dict, rate: float, duration: int, agents: int = 1, remote_agents: list[str] = None, concurrency: int = 16, timeout: int = 60):
+        '''Load test functions from multiple load-generator processes and merge their results'''
+        result = []
+        saturation = []
+        for function, conf in tqdm(functions.items(), desc='Loading Functions', unit='function', position=0, ncols=80, leave=None, bar_format='{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}]'):
+            # Fork local agents and connect to remote ones
+            channels = {}
+            processes = []
+            for i in range(agents):
+                parent, child = multiprocessing.Pipe()
+                process = multiprocessing.Process(target=run_local_agent, args=(child,), daemon=True)
+                process.start()
+                child.close()
+                channels[f'local-{i}'] = parent
+                processes.append(process)
+            for address in remote_agents or []:
+                channels[address] = SocketChannel.connect(address)
+            if len(channels) == 0:
+                raise RuntimeError('No load agents')
+
+            # Each agent drives an equal share of the load, and all start once every agent is ready
+            job = {
+                'url': f'{self.gateway}/function/{function}',
+                'headers': self.headers,
+                'request_body': conf.get('request_body'),
+                'rate': rate / len(channels),
+                'duration': duration,
+                'concurrency': max(1, concurrency // len(channels)),
+                'timeout': timeout,
+            }
+            for channel in channels.values():
+                channel.send(job)
+            for name, channel in channels.items():
+                if channel.recv().get('type') != 'ready':
+                    raise RuntimeError(f'Load agent {name} is not ready')
+            for channel in channels.values():
+                channel.send({'type': 'start'})
+
+            messages = queue.Queue()
+            def collect(name, channel):
+                while True:
+                    try:
+                        message = channel.recv()
+                    except (EOFError, OSError):
+                        message = {'type': 'lost'}
+                    messages.put((name, message))
+                    if message['type'] != 'batch':
+                        break
+            for name, channel in channels.items():
+                threading.Thread(target=collect, args=(name, channel), daemon=True).start()
+
+            # Merge batches streamed back by the agents
+            latency = Histogram()
+            e2e_latency = Histogram()
+            service_latency = Histogram()
+            errors = 0
+            stats = {name: {'cpu': [], 'lag': Histogram(), 'queueing': Histogram(), 'errors': 0} for name in channels}
+            remaining = len(channels)
+            with tqdm(total=duration * len(channels), desc=f'Loading {function}', unit='batch', position=1, ncols=80, leave=None) as progress:
+                while remaining > 0:
+                    name, message = messages.get()
+                    if message['type'] == 'lost':
+                        raise RuntimeError(f'Lost load agent {name}')
+                    latency.merge(Histogram.from_dict(message['latency']))
+                    e2e_latency.merge(Histogram.from_dict(message['e2e_latency']))
+                    service_latency.merge(Histogram.from_dict(message['service_latency']))
+                    errors += message['errors']
+                    stats[name]['cpu'].append(message['cpu'])
+                    stats[name]['lag'].merge(Histogram.from_dict(message['lag']))
+                    stats[name]['queueing'].merge(Histogram.from_dict(message['queueing']))
+                    stats[name]['errors'] += message['errors']
+                    progress.update()
+                    if message['type'] == 'done':
+                        remaining -= 1
+
+            for process in processes:
+                process.join()
+            for channel in channels.values():
+                channel.close()
+
+            result.append({
+                'Name': function,
+                'Requests': latency.count,
+                'Errors': errors,
+                'Throughput(req/s)': latency.count / duration,
+                'Average Latency(ms)': latency.mean() * 1000,
+                'P50 E2E Latency(ms)': e2e_latency.percentile(50) * 1000,
+                'P99 E2E Latency(ms)': e2e_latency.percentile(99) * 1000,
+                'P99 Service Latency(ms)': service_latency.percentile(99) * 1000,
+            })
+            for name, stat in stats.items():
+                # CPU is per process, so a GIL-bound agent saturates around 100%. Queueing for
+                # a worker grows when functions are slow, so only dispatcher lag counts here
+                max_cpu = max(stat['cpu'], default=0)
+                lag = stat['lag'].percentile(99)
+                saturation.append({
+                    'Name': function,
+                    'Agent': name,
+                    'Average CPU(%)': sum(stat['cpu']) / max(len(stat['cpu']), 1),
+                    'Max CPU(%)': max_cpu,
+                    'P99 Lag(ms)': lag * 1000,
+                    'P99 Queueing(ms)': stat['queueing'].percentile(99) * 1000,
+                    'Errors': stat['errors'],
+                    'Saturated': 'yes' if max_cpu >= SATURATION_CPU or lag >= SATURATION_LAG else 'no',
+                })
+
+        print('Load test completed')
+        print(tabulate.tabulate(result, headers='keys', floatfmt='.3f', numalign='right'))
+        print(tabulate.tabulate(saturation, headers='keys', floatfmt='.3f', numalign='right'))
+        if any(item['Saturated'] == 'yes' for item in saturation):
+            print('Warning: Some load agents are saturated, add more agents to measure faasd rather than the client')
+
+        return result, saturation
+
+    def profile_startup(self, functions: dict, environment: dict = None, command: list[str] = None, top: int = 10, output: str = None):
+        '''Profile per-module import time of Python function images at startup'''
+        with open(path.join('functions', 'functions.yml'), 'r') as f:
+            stack = yaml.load(f, Loader=yaml.SafeLoader)
+        if command is None:
+            command = STARTUP_COMMAND
+        env_args = []
+        for key, value in (environment or {}).items():
+            env_args += ['-e', f'{key}={str(value).lower() if isinstance(value, bool) else value}']
+
+        result = []
+        profiles = {}
+        for function in tqdm(functions, desc='Profiling Functions', unit='function', ncols=80, leave=None):
+            spec = stack.get('functions', {}).get(function)
+            if spec is None or not spec.get('lang', '').endswith('-py'):
+                continue
+
+            start = time()
+            process = subprocess.run(['docker', 'run', '--rm', *env_args, '--entrypoint', command[0], spec['image'], *command[1:]], capture_output=True, text=True)
+            container_time = time() - start
+            if process.returncode != 0:
+                # Keep profiling the other functions
+                error = process.stderr.strip().splitlines()[-1] if process.stderr.strip() else f'exit code {process.returncode}'
+                print(f'Warning: Failed to profile {function}: {error}')
+                result.append({'Name': function, 'Error': error})
+                continue
+
+            boot = self.boot_path(self.parse_import_time(process.stderr))
+            profiles[function] = boot
+            slowest = max(self.flatten_imports(boot), key=lambda node: node['cumulative'], default=None)
+            result.append({
+                'Name': function,
+                'Modules': sum(self.count_modules(node) for node in boot),
+                'Boot Import Time(ms)': sum(node['cumulative'] for node in boot) / 1000,
+                'Container Time(ms)': container_time * 1000,
+                'Slowest Import': slowest['name'] if slowest is not None else '',
+                'Error': '',
+            })
+
+        print('Profile completed')
+        print(tabulate.tabulate(result, headers='keys', floatfmt='.3f', numalign='right', missingval='-'))
+        for function, boot in profiles.items():
+            heaviest = sorted(self.flatten_imports(boot), key=lambda node: node['cumulative'], reverse=True)[:top]
+            print(f'\nTop {len(heaviest)} imports of {function}:')
+            print(tabulate.tabulate([{
+                'Module': node['name'],
+                'Self(ms)': node['self'] / 1000,
+                'Cumulative(ms)': node['cumulative'] / 1000,
+            } for node in heaviest], headers='keys', floatfmt='.3f', numalign='right'))
+
+        if output is not None:
+            with open(output, 'w') as f:
+                json.dump(profiles, f, indent=2)
+
+        return profiles
+
+    @staticmethod
+    def parse_import_time(text: str) -> list[dict]:
+        '''Parse `-X importtime` output into a tree of imported modules (times in us)'''
+        # Modules are reported after their children, indented by two spaces per level
+        pending = defaultdict(list)
+        for line in text.splitlines():
+            if not line.startswith('import time:'):
+                continue
+            fields = line[len('import time:'):].split('|')
+            if len(fields) != 3 or not fields[0].strip().isdigit():
+                continue
+            name = fields[2].rstrip()
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            pending[depth].append({
+                'name': name.strip(),
+                'self': int(fields[0]),
+                'cumulative': int(fields[1]),
+                'children': pending.pop(depth + 1, []),
+            })
+        return pending[0]
+
+    @staticmethod
+    def is_boot_module(name: str) -> bool:
+        '''Whether a module belongs to the function boot path itself'''
+        return any(name == module or name.startswith(f'{module}.') for module in STARTUP_MODULES)
+
+    @staticmethod
+    def boot_path(tree: list[dict]) -> list[dict]:
+        '''Select the top-level imports of the function boot path, leaving out interpreter startup'''
+        return [node for node in tree if TestDriver.is_boot_module(node['name'])]
+
+    @staticmethod
+    def flatten_imports(nodes: list[dict]) -> list[dict]:
+        '''List all imports under nodes, leaving out the boot path modules themselves'''
+        result = []
+        for node in nodes:
+            if not TestDriver.is_boot_module(node['name']):
+                result.append(node)
+            result += TestDriver.flatten_imports(node['children'])
+        return result
+
+    @staticmethod
+    def count_modules(node: dict) -> int:
+        '''Count modules in an import tree node'''
+        return 1 + sum(TestDriver.count_modules(child) for child in node['children'])
+
     @staticmethod
     def draw_result(data: list[dict]):
         '''Draw test result'''
         # Prepare data
         names = [item['Name'] for item in data]
         avg_latency = [item['Average Latency(ms)'] for item in data]
+        avg_transfer_latency = [item['Average Transfer Latency(ms)'] for item in data]
         avg_other_latency = [item['Average Other Latencies(ms)'] for item in data]
 
         # Set x axis range
@@ -133,7 +566,8 @@ class TestDriver:
 
         # Draw bar chart
         plt.bar(x, avg_latency, width=0.4, label='Average Computing Latency (ms)')
-        plt.bar(x, avg_other_latency, width=0.4, label='Average Other Latencies (ms)', bottom=avg_latency)
+        plt.bar(x, avg_transfer_latency, width=0.4, label='Average Transfer Latency (ms)', bottom=avg_latency)
+        plt.bar(x, avg_other_latency, width=0.4, label='Average Other Latencies (ms)', bottom=[a + b for a, b in zip(avg_latency, avg_transfer_latency)])
 
         # Set title, x axis label and y axis label
         plt.title('Latency Comparison')
@@ -150,6 +584,33 @@ class TestDriver:
         plt.subplots_adjust(bottom=0.25)
         plt.show()
 
+    @staticmethod
+    def draw_heatmap(data: dict, names: list[str]):
+        '''Draw slowdown heatmap'''
+        # Prepare data, pairs not tested are left blank
+        matrix = [[data[target][antagonist] if data[target][antagonist] is not None else float('nan') for antagonist in names] for target in names]
+
+        # Draw heatmap
+        plt.imshow(matrix, cmap='Reds')
+        plt.colorbar(label='Slowdown')
+        for i, row in enumerate(matrix):
+            for j, value in enumerate(row):
+                if value == value:
+                    plt.text(j, i, f'{value:.2f}', ha='center', va='center')
+
+        # Set title, x axis label and y axis label
+        plt.title('Interference Slowdown')
+        plt.xlabel('Antagonist Function')
+        plt.ylabel('Target Function')
+
+        # Set axis scale
+        plt.xticks(range(len(names)), names, rotation=30)
+        plt.yticks(range(len(names)), names)
+
+        # Show plot
+        plt.subplots_adjust(bottom=0.25)
+        plt.show()
+
     @staticmethod
     def draw_memory_graph(data: list[float], names: list[str]):
         '''Draw memory usage graph'''